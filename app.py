@@ -1,7 +1,10 @@
 import os
-from flask import Flask, render_template
+from flask import Flask, make_response, render_template, request
 from flask_sqlalchemy import SQLAlchemy
+from jinja2 import FileSystemBytecodeCache
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import NullPool
+from werkzeug.middleware.profiler import ProfilerMiddleware
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 
@@ -13,31 +16,55 @@ db = SQLAlchemy(model_class=Base)
 
 def create_app():
     app = Flask(__name__)
-    app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
-    app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+    # Encode once so session signing doesn't re-encode the key on every request
+    app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production").encode()
+    app.config["BEHIND_PROXY"] = os.environ.get("BEHIND_PROXY", "1") != "0"
+    if app.config["BEHIND_PROXY"]:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
-    # Configure the database
-    database_url = os.environ.get("DATABASE_URL")
-    if database_url:
-        app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    # Opt-in per-request profiling; stats are printed and saved as .prof files
+    if os.environ.get("FLASK_PROFILE") == "1":
+        profile_dir = os.path.join(app.instance_path, "profiles")
+        os.makedirs(profile_dir, exist_ok=True)
+        app.wsgi_app = ProfilerMiddleware(app.wsgi_app, restrictions=[30], profile_dir=profile_dir)
+
+    # Configure the database, falling back to SQLite for development
+    database_url = os.environ.get("DATABASE_URL", "sqlite:///expenses.db")
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    if database_url.startswith("sqlite"):
+        # SQLite serializes writes anyway; don't hold pooled connections open.
+        # In-memory databases keep Flask-SQLAlchemy's StaticPool default.
+        if ":memory:" not in database_url and database_url != "sqlite://":
+            app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {"poolclass": NullPool}
+    else:
         app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-            "pool_recycle": 300,
+            "pool_size": int(os.environ.get("SQLALCHEMY_POOL_SIZE", 10)),
+            "max_overflow": int(os.environ.get("SQLALCHEMY_MAX_OVERFLOW", 20)),
+            "pool_timeout": int(os.environ.get("SQLALCHEMY_POOL_TIMEOUT", 30)),
+            "pool_recycle": int(os.environ.get("SQLALCHEMY_POOL_RECYCLE", 300)),
             "pool_pre_ping": True,
         }
-    else:
-        # Fallback to SQLite for development
-        app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///expenses.db"
     
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     
     # Initialize the app with the extension
     db.init_app(app)
 
+    # Share compiled templates between workers instead of compiling per process
+    if not app.debug:
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+
     @app.route('/')
     def index():
-        return render_template('index.html')
+        # ETag the page shell so browsers can revalidate it with a 304
+        response = make_response(render_template('index.html'))
+        response.add_etag()
+        return response.make_conditional(request)
 
-    with app.app_context():
+    @app.cli.command('init-db')
+    def init_db():
+        """Create the database tables."""
         db.create_all()
+        print('Database initialized.')
 
     return app
\ No newline at end of file
@@ -5,8 +5,13 @@ let currentChart = null;
 let trendsChart = null;
 let comparisonChart = null;
 let exchangeRateCache = {};
-let isLoadingExchangeRate = false;
+let trmCache = JSON.parse(localStorage.getItem('trmCache')) || { rate: null, fetchedAt: 0 };
+const TRM_CACHE_TTL = 5 * 60 * 1000; // 5 minutes
+let pendingTRMRequest = null;
 let conversionTimeout = null;
+const HISTORY_PAGE_SIZE = 50;
+const RECENT_TRANSACTIONS_LIMIT = 5;
+let historyLimit = HISTORY_PAGE_SIZE;
 
 // Initialize the application
 document.addEventListener('DOMContentLoaded', function() {
@@ -474,39 +479,43 @@ function updateExchangeImpact() {
         return;
     }
 
-    // Calculate average exchange rate used
-    const ratesUsed = transactions
-        .filter(t => t.exchangeRate)
-        .map(t => t.exchangeRate);
+    // Collect exchange rate stats and the balance with current vs historical
+    // rates in a single pass over the transactions
+    let rateSum = 0;
+    let rateCount = 0;
+    let minRate = Infinity;
+    let maxRate = -Infinity;
+    let balanceWithCurrentRate = 0;
+    let balanceWithHistoricalRates = 0;
     
-    if (ratesUsed.length === 0) {
+    transactions.forEach(transaction => {
+        const rate = transaction.exchangeRate;
+        if (rate) {
+            rateSum += rate;
+            rateCount++;
+            if (rate < minRate) minRate = rate;
+            if (rate > maxRate) maxRate = rate;
+        }
+        
+        const currentUsdAmount = transaction.currency === 'USD'
+            ? transaction.amount
+            : transaction.amount / TRM_RATE; // Using current rate
+        
+        if (transaction.type === 'income') {
+            balanceWithCurrentRate += currentUsdAmount;
+            balanceWithHistoricalRates += transaction.usdAmount;
+        } else {
+            balanceWithCurrentRate -= currentUsdAmount;
+            balanceWithHistoricalRates -= transaction.usdAmount;
+        }
+    });
+    
+    if (rateCount === 0) {
         exchangeImpactDiv.innerHTML = '<p class="text-center text-muted">No hay datos de tipo de cambio</p>';
         return;
     }
 
-    const avgRate = ratesUsed.reduce((sum, rate) => sum + rate, 0) / ratesUsed.length;
-    const minRate = Math.min(...ratesUsed);
-    const maxRate = Math.max(...ratesUsed);
-    
-    // Calculate what total balance would be with current vs historical rates
-    const balanceWithCurrentRate = transactions.reduce((sum, transaction) => {
-        let usdAmount;
-        if (transaction.currency === 'USD') {
-            usdAmount = transaction.amount;
-        } else {
-            usdAmount = transaction.amount / TRM_RATE; // Using current rate
-        }
-        
-        return transaction.type === 'income' 
-            ? sum + usdAmount 
-            : sum - usdAmount;
-    }, 0);
-
-    const balanceWithHistoricalRates = transactions.reduce((sum, transaction) => {
-        return transaction.type === 'income' 
-            ? sum + transaction.usdAmount 
-            : sum - transaction.usdAmount;
-    }, 0);
+    const avgRate = rateSum / rateCount;
 
     const rateDifference = balanceWithCurrentRate - balanceWithHistoricalRates;
     const percentageDifference = balanceWithHistoricalRates !== 0 
@@ -635,22 +644,25 @@ function formatCurrencyInput(input, currency) {
     }
 }
 
+// Intl.NumberFormat instances are expensive to build, so create them once
+const currencyFormatters = {
+    USD: new Intl.NumberFormat('en-US', {
+        style: 'currency',
+        currency: 'USD',
+        minimumFractionDigits: 2,
+        maximumFractionDigits: 2
+    }),
+    COP: new Intl.NumberFormat('es-CO', {
+        style: 'currency',
+        currency: 'COP',
+        minimumFractionDigits: 0,
+        maximumFractionDigits: 0
+    })
+};
+
 function formatCurrencyDisplay(amount, currency) {
-    if (currency === 'USD') {
-        return new Intl.NumberFormat('en-US', {
-            style: 'currency',
-            currency: 'USD',
-            minimumFractionDigits: 2,
-            maximumFractionDigits: 2
-        }).format(amount);
-    } else {
-        return new Intl.NumberFormat('es-CO', {
-            style: 'currency',
-            currency: 'COP',
-            minimumFractionDigits: 0,
-            maximumFractionDigits: 0
-        }).format(amount);
-    }
+    const formatter = currency === 'USD' ? currencyFormatters.USD : currencyFormatters.COP;
+    return formatter.format(amount);
 }
 
 function getCurrencyForInput(input) {
@@ -694,10 +706,30 @@ function updateCurrencySymbol(symbolId, currency) {
 
 // Exchange Rate API Functions
 async function fetchTRM() {
+    // Serve the latest rate from memory while it is fresh
+    if (trmCache.rate && Date.now() - trmCache.fetchedAt < TRM_CACHE_TTL) {
+        return trmCache.rate;
+    }
+    
+    // Concurrent callers share a single in-flight request
+    if (!pendingTRMRequest) {
+        pendingTRMRequest = requestTRM().finally(() => {
+            pendingTRMRequest = null;
+        });
+    }
+    return pendingTRMRequest;
+}
+
+async function requestTRM() {
     try {
         const res = await fetch("https://open.er-api.com/v6/latest/USD");
         const data = await res.json();
         const trm = data.rates.COP;
+        if (trm) {
+            trmCache = { rate: trm, fetchedAt: Date.now() };
+            // Persist so reloads within the TTL don't hit the API again
+            localStorage.setItem('trmCache', JSON.stringify(trmCache));
+        }
         return trm;
     } catch (e) {
         console.error("Error obteniendo TRM:", e);
@@ -752,44 +784,18 @@ async function getExchangeRateForDate(date) {
         return exchangeRateCache[date];
     }
     
-    if (isLoadingExchangeRate) {
-        // Wait for current request to complete
-        await new Promise(resolve => setTimeout(resolve, 1000));
-        if (exchangeRateCache[date]) {
-            return exchangeRateCache[date];
-        }
-    }
-    
-    isLoadingExchangeRate = true;
-    
     try {
-        // For current/recent dates, use the current TRM
-        const today = new Date();
-        const requestDate = new Date(date);
-        const daysDiff = Math.abs(today - requestDate) / (1000 * 60 * 60 * 24);
-        
-        let rate;
-        if (daysDiff <= 7) {
-            // Use current rate for recent dates (within a week)
-            rate = await fetchTRM();
-        } else {
-            // For older dates, use current rate as approximation
-            rate = await fetchTRM();
-        }
-        
-        if (!rate) {
-            rate = TRM_RATE;
-        }
+        // The API only exposes the latest rate, so it is used for every date
+        // (recent dates exactly, older ones as an approximation)
+        const rate = (await fetchTRM()) || TRM_RATE;
         
         // Cache the result
         exchangeRateCache[date] = rate;
-        isLoadingExchangeRate = false;
         
         return rate;
         
     } catch (error) {
         console.error('Error fetching exchange rate for date:', date, error);
-        isLoadingExchangeRate = false;
         return TRM_RATE; // Fallback to current rate
     }
 }
@@ -813,6 +819,7 @@ async function refreshTRM() {
     try {
         // Clear cache to force fresh fetch
         exchangeRateCache = {};
+        trmCache = { rate: null, fetchedAt: 0 };
         
         const trm = await fetchTRM();
         if (trm) {
@@ -852,68 +859,40 @@ async function refreshTRM() {
 }
 
 function updateDashboard() {
-    const currentMonth = new Date().getMonth();
-    const currentYear = new Date().getFullYear();
-    
-    // Calculate totals using the USD amount stored with each transaction
-    const totalBalance = transactions.reduce((sum, transaction) => {
-        return transaction.type === 'income' 
-            ? sum + transaction.usdAmount 
-            : sum - transaction.usdAmount;
-    }, 0);
-    
-    // Calculate monthly totals and their COP equivalents using original exchange rates
-    const monthlyIncomeTransactions = transactions.filter(t => {
-        const transactionDate = new Date(t.date);
-        return t.type === 'income' && 
-               transactionDate.getMonth() === currentMonth && 
-               transactionDate.getFullYear() === currentYear;
-    });
-    
-    const monthlyExpenseTransactions = transactions.filter(t => {
-        const transactionDate = new Date(t.date);
-        return t.type === 'expense' && 
-               transactionDate.getMonth() === currentMonth && 
-               transactionDate.getFullYear() === currentYear;
-    });
-    
-    const monthlyIncome = monthlyIncomeTransactions.reduce((sum, t) => sum + t.usdAmount, 0);
-    const monthlyExpenses = monthlyExpenseTransactions.reduce((sum, t) => sum + t.usdAmount, 0);
-    
-    // Calculate COP equivalents using the original transaction rates when possible
-    const monthlyIncomeCOP = monthlyIncomeTransactions.reduce((sum, t) => {
-        if (t.currency === 'COP') {
-            return sum + t.amount; // Original COP amount
-        } else {
-            const rate = t.exchangeRate || TRM_RATE;
-            return sum + (t.amount * rate); // USD to COP using original rate
-        }
-    }, 0);
+    const { start: monthStart, end: monthEnd } = getMonthRange(new Date());
     
-    const monthlyExpensesCOP = monthlyExpenseTransactions.reduce((sum, t) => {
-        if (t.currency === 'COP') {
-            return sum + t.amount; // Original COP amount
-        } else {
-            const rate = t.exchangeRate || TRM_RATE;
-            return sum + (t.amount * rate); // USD to COP using original rate
-        }
-    }, 0);
+    // Accumulate balance and current-month totals, in USD and COP, in one pass.
+    // COP equivalents use the original transaction rate when possible.
+    let totalBalance = 0;
+    let totalBalanceCOP = 0;
+    let monthlyIncome = 0;
+    let monthlyExpenses = 0;
+    let monthlyIncomeCOP = 0;
+    let monthlyExpensesCOP = 0;
     
-    // For total balance COP, we need to convert using current rate since it's a mixed calculation
-    const totalBalanceCOP = transactions.reduce((sum, transaction) => {
-        const rate = transaction.exchangeRate || TRM_RATE;
-        let copAmount;
+    transactions.forEach(transaction => {
+        const usdAmount = transaction.usdAmount;
+        const copAmount = transaction.currency === 'COP'
+            ? transaction.amount // Original COP amount
+            : transaction.amount * (transaction.exchangeRate || TRM_RATE); // USD to COP using original rate
+        const inCurrentMonth = transaction.date >= monthStart && transaction.date < monthEnd;
         
-        if (transaction.currency === 'COP') {
-            copAmount = transaction.amount;
+        if (transaction.type === 'income') {
+            totalBalance += usdAmount;
+            totalBalanceCOP += copAmount;
+            if (inCurrentMonth) {
+                monthlyIncome += usdAmount;
+                monthlyIncomeCOP += copAmount;
+            }
         } else {
-            copAmount = transaction.amount * rate;
+            totalBalance -= usdAmount;
+            totalBalanceCOP -= copAmount;
+            if (inCurrentMonth) {
+                monthlyExpenses += usdAmount;
+                monthlyExpensesCOP += copAmount;
+            }
         }
-        
-        return transaction.type === 'income' 
-            ? sum + copAmount 
-            : sum - copAmount;
-    }, 0);
+    });
     
     // Update UI
     updateElement('totalBalance', `$${formatNumber(totalBalance, 2)}`);
@@ -937,9 +916,20 @@ function updateRecentTransactions() {
     const recentTransactionsDiv = document.getElementById('recentTransactions');
     if (!recentTransactionsDiv) return;
     
-    const recentTransactions = transactions
-        .sort((a, b) => new Date(b.date) - new Date(a.date))
-        .slice(0, 5);
+    // Keep the newest few in a single pass rather than sorting the whole list
+    const recentTransactions = [];
+    transactions.forEach(transaction => {
+        let i = recentTransactions.length;
+        while (i > 0 && compareByDateDesc(transaction, recentTransactions[i - 1]) < 0) {
+            i--;
+        }
+        if (i < RECENT_TRANSACTIONS_LIMIT) {
+            recentTransactions.splice(i, 0, transaction);
+            if (recentTransactions.length > RECENT_TRANSACTIONS_LIMIT) {
+                recentTransactions.pop();
+            }
+        }
+    });
     
     if (recentTransactions.length === 0) {
         recentTransactionsDiv.innerHTML = `
@@ -1019,17 +1009,11 @@ function updateExpenseChart() {
     if (!canvas) return;
     
     const ctx = canvas.getContext('2d');
-    const currentMonth = new Date().getMonth();
-    const currentYear = new Date().getFullYear();
+    const { start: monthStart, end: monthEnd } = getMonthRange(new Date());
     
     // Get current month expenses by category
     const monthlyExpenses = transactions
-        .filter(t => {
-            const transactionDate = new Date(t.date);
-            return t.type === 'expense' && 
-                   transactionDate.getMonth() === currentMonth && 
-                   transactionDate.getFullYear() === currentYear;
-        });
+        .filter(t => t.type === 'expense' && t.date >= monthStart && t.date < monthEnd);
     
     const categoryTotals = {};
     monthlyExpenses.forEach(expense => {
@@ -1109,10 +1093,8 @@ function updateTransactionHistory() {
     const categoryFilter = document.getElementById('filterCategory')?.value;
     
     if (monthFilter) {
-        filteredTransactions = filteredTransactions.filter(t => {
-            const transactionMonth = new Date(t.date).getMonth() + 1;
-            return transactionMonth.toString().padStart(2, '0') === monthFilter;
-        });
+        // Dates are 'YYYY-MM-DD', so the month is characters 5-6
+        filteredTransactions = filteredTransactions.filter(t => t.date.slice(5, 7) === monthFilter);
     }
     
     if (typeFilter) {
@@ -1124,7 +1106,7 @@ function updateTransactionHistory() {
     }
     
     // Sort by date (newest first)
-    filteredTransactions.sort((a, b) => new Date(b.date) - new Date(a.date));
+    filteredTransactions.sort(compareByDateDesc);
     
     if (filteredTransactions.length === 0) {
         historyDiv.innerHTML = `
@@ -1136,9 +1118,25 @@ function updateTransactionHistory() {
         return;
     }
     
-    historyDiv.innerHTML = filteredTransactions
+    // Only render one page at a time; large histories are revealed on demand
+    const visibleTransactions = filteredTransactions.slice(0, historyLimit);
+    const remaining = filteredTransactions.length - visibleTransactions.length;
+    
+    historyDiv.innerHTML = visibleTransactions
         .map(transaction => createTransactionHTML(transaction))
-        .join('');
+        .join('') + (remaining > 0 ? `
+        <div class="text-center p-3">
+            <button type="button" onclick="loadMoreHistory()" class="btn btn-secondary">
+                <i class="bi bi-chevron-down"></i>
+                <span>Ver más (${remaining} restantes)</span>
+            </button>
+        </div>
+    ` : '');
+}
+
+function loadMoreHistory() {
+    historyLimit += HISTORY_PAGE_SIZE;
+    updateTransactionHistory();
 }
 
 function updateCategoryFilters() {
@@ -1161,37 +1159,45 @@ function updateCategoryFilters() {
 }
 
 function applyFilters() {
+    historyLimit = HISTORY_PAGE_SIZE;
     updateTransactionHistory();
     showNotification('Filtros aplicados', 'info');
 }
 
 function updateReports() {
-    updateMonthlySummary();
-    updateTrendsChart();
-    updateComparisonChart();
+    // Aggregate once and share the result between the three report views
+    const monthlyTotals = getMonthlyTotals();
+    updateMonthlySummary(monthlyTotals);
+    updateTrendsChart(monthlyTotals);
+    updateComparisonChart(monthlyTotals);
 }
 
-function updateMonthlySummary() {
-    const summaryDiv = document.getElementById('monthlySummary');
-    if (!summaryDiv) return;
-    
-    const monthlyData = {};
+// Income/expense USD totals keyed by 'YYYY-MM', built in a single pass.
+// The month key is sliced from the ISO date string instead of parsing a Date.
+function getMonthlyTotals() {
+    const monthlyTotals = {};
     
     transactions.forEach(transaction => {
-        const date = new Date(transaction.date);
-        const monthKey = `${date.getFullYear()}-${(date.getMonth() + 1).toString().padStart(2, '0')}`;
+        const monthKey = transaction.date.slice(0, 7);
         
-        if (!monthlyData[monthKey]) {
-            monthlyData[monthKey] = { income: 0, expenses: 0 };
+        if (!monthlyTotals[monthKey]) {
+            monthlyTotals[monthKey] = { income: 0, expenses: 0 };
         }
         
         if (transaction.type === 'income') {
-            monthlyData[monthKey].income += transaction.usdAmount;
+            monthlyTotals[monthKey].income += transaction.usdAmount;
         } else {
-            monthlyData[monthKey].expenses += transaction.usdAmount;
+            monthlyTotals[monthKey].expenses += transaction.usdAmount;
         }
     });
     
+    return monthlyTotals;
+}
+
+function updateMonthlySummary(monthlyData) {
+    const summaryDiv = document.getElementById('monthlySummary');
+    if (!summaryDiv) return;
+    
     const sortedMonths = Object.keys(monthlyData).sort().reverse().slice(0, 6);
     
     if (sortedMonths.length === 0) {
@@ -1229,7 +1235,7 @@ function updateMonthlySummary() {
     }).join('');
 }
 
-function updateTrendsChart() {
+function updateTrendsChart(monthlyTotals) {
     const canvas = document.getElementById('trendsChart');
     if (!canvas) return;
     
@@ -1237,25 +1243,9 @@ function updateTrendsChart() {
     
     // Get last 6 months of data
     const monthlyExpenses = {};
-    const currentDate = new Date();
-    
-    // Initialize last 6 months
-    for (let i = 5; i >= 0; i--) {
-        const date = new Date(currentDate.getFullYear(), currentDate.getMonth() - i, 1);
-        const monthKey = `${date.getFullYear()}-${(date.getMonth() + 1).toString().padStart(2, '0')}`;
-        monthlyExpenses[monthKey] = 0;
-    }
-    
-    // Calculate expenses for each month
-    transactions
-        .filter(t => t.type === 'expense')
-        .forEach(transaction => {
-            const date = new Date(transaction.date);
-            const monthKey = `${date.getFullYear()}-${(date.getMonth() + 1).toString().padStart(2, '0')}`;
-            if (monthlyExpenses.hasOwnProperty(monthKey)) {
-                monthlyExpenses[monthKey] += transaction.usdAmount;
-            }
-        });
+    getRecentMonthKeys(6).forEach(monthKey => {
+        monthlyExpenses[monthKey] = monthlyTotals[monthKey] ? monthlyTotals[monthKey].expenses : 0;
+    });
     
     const labels = Object.keys(monthlyExpenses).map(key => {
         const [year, month] = key.split('-');
@@ -1316,7 +1306,7 @@ function updateTrendsChart() {
     });
 }
 
-function updateComparisonChart() {
+function updateComparisonChart(monthlyTotals) {
     const canvas = document.getElementById('comparisonChart');
     if (!canvas) return;
     
@@ -1324,26 +1314,8 @@ function updateComparisonChart() {
     
     // Get last 6 months of data
     const monthlyData = {};
-    const currentDate = new Date();
-    
-    // Initialize last 6 months
-    for (let i = 5; i >= 0; i--) {
-        const date = new Date(currentDate.getFullYear(), currentDate.getMonth() - i, 1);
-        const monthKey = `${date.getFullYear()}-${(date.getMonth() + 1).toString().padStart(2, '0')}`;
-        monthlyData[monthKey] = { income: 0, expenses: 0 };
-    }
-    
-    // Calculate data for each month
-    transactions.forEach(transaction => {
-        const date = new Date(transaction.date);
-        const monthKey = `${date.getFullYear()}-${(date.getMonth() + 1).toString().padStart(2, '0')}`;
-        if (monthlyData.hasOwnProperty(monthKey)) {
-            if (transaction.type === 'income') {
-                monthlyData[monthKey].income += transaction.usdAmount;
-            } else {
-                monthlyData[monthKey].expenses += transaction.usdAmount;
-            }
-        }
+    getRecentMonthKeys(6).forEach(monthKey => {
+        monthlyData[monthKey] = monthlyTotals[monthKey] || { income: 0, expenses: 0 };
     });
     
     const labels = Object.keys(monthlyData).map(key => {
@@ -1414,20 +1386,52 @@ function saveTransactions() {
     localStorage.setItem('transactions', JSON.stringify(transactions));
 }
 
+// Cached number formatters keyed by decimal places
+const numberFormatters = {};
+
 function formatNumber(number, decimals = 0) {
-    return new Intl.NumberFormat('es-CO', {
-        minimumFractionDigits: decimals,
-        maximumFractionDigits: decimals
-    }).format(number);
+    if (!numberFormatters[decimals]) {
+        numberFormatters[decimals] = new Intl.NumberFormat('es-CO', {
+            minimumFractionDigits: decimals,
+            maximumFractionDigits: decimals
+        });
+    }
+    return numberFormatters[decimals].format(number);
+}
+
+// Newest-first comparator on ISO 'YYYY-MM-DD' dates without parsing them
+function compareByDateDesc(a, b) {
+    return a.date < b.date ? 1 : a.date > b.date ? -1 : 0;
+}
+
+// 'YYYY-MM' keys for the last `count` calendar months, oldest first
+function getRecentMonthKeys(count) {
+    const currentDate = new Date();
+    const keys = [];
+    
+    for (let i = count - 1; i >= 0; i--) {
+        const date = new Date(currentDate.getFullYear(), currentDate.getMonth() - i, 1);
+        keys.push(`${date.getFullYear()}-${(date.getMonth() + 1).toString().padStart(2, '0')}`);
+    }
+    
+    return keys;
+}
+
+// Half-open [start, end) ISO date bounds of the month containing `date`.
+// Transaction dates are 'YYYY-MM-DD' strings, so they compare correctly as text.
+function getMonthRange(date) {
+    const next = new Date(date.getFullYear(), date.getMonth() + 1, 1);
+    return {
+        start: `${date.getFullYear()}-${(date.getMonth() + 1).toString().padStart(2, '0')}-01`,
+        end: `${next.getFullYear()}-${(next.getMonth() + 1).toString().padStart(2, '0')}-01`
+    };
 }
 
 function formatDate(dateString) {
-    const date = new Date(dateString);
-    return date.toLocaleDateString('es-ES', {
-        day: '2-digit',
-        month: '2-digit',
-        year: 'numeric'
-    });
+    // Rearrange 'YYYY-MM-DD' into 'DD/MM/YYYY' directly; going through
+    // new Date() parses as UTC and can show the previous day locally
+    const [year, month, day] = dateString.split('-');
+    return `${day}/${month}/${year}`;
 }
 
 function updateElement(id, content) {